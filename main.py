@@ -1,10 +1,16 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import plotly.express as px
 from pathlib import Path
+from functools import lru_cache, partial
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 import unicodedata
+import os
+import hashlib
+import shutil
 import io
 
 # 페이지 설정
@@ -32,82 +38,807 @@ SCHOOL_INFO = {
     "동산고": {"ec": 8.0, "color": "#FFA07A"}
 }
 
+# 학교 순서와 색상표 (그래프마다 다시 만들지 않도록 한 번만 계산)
+SCHOOL_ORDER = list(SCHOOL_INFO.keys())
+SCHOOL_COLOR_MAP = {school: info["color"] for school, info in SCHOOL_INFO.items()}
+# 파일명·시트명 비교용 학교명 (NFC, NFD) 정규화 결과
+SCHOOL_NORMS = {
+    school: (unicodedata.normalize("NFC", school), unicodedata.normalize("NFD", school))
+    for school in SCHOOL_INFO
+}
+
+# 환경 데이터 측정 항목 (센서 정밀도가 0.1 수준이라 float32로 충분)
+ENV_METRICS = ["temperature", "humidity", "ph", "ec"]
+ENV_COLUMNS = ["time"] + ENV_METRICS
+# 시간은 학교마다 형식이 달라 일단 문자열로 읽음 (pyarrow가 일부 파일만 날짜로 추론하는 것 방지)
+ENV_DTYPES = {"time": str, **{col: "float32" for col in ENV_METRICS}}
+
+# 환경 데이터 시간 형식 후보 (학교마다 기록 방식이 다름)
+TIME_FORMATS = [
+    "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M",
+    "%Y.%m.%d %H:%M:%S", "%Y.%m.%d %H:%M",
+    "%Y/%m/%d %H:%M:%S", "%Y/%m/%d %H:%M"
+]
+
+# 생육 결과 지표
+GROWTH_METRICS = ["생중량(g)", "잎 수(장)", "지상부 길이(mm)"]
+GROWTH_COLUMN_KEYWORDS = {"생중량": "생중량(g)", "잎 수": "잎 수(장)", "지상부": "지상부 길이(mm)"}
+# 잎 수는 정수(빈 값 허용, 소수가 섞이면 float32), 무게·길이는 측정 정밀도상 float32로 충분
+GROWTH_DTYPES = {"생중량(g)": "float32", "잎 수(장)": pd.Int16Dtype(), "지상부 길이(mm)": "float32"}
+
+# 시계열 그래프에 그릴 최대 점 개수
+MAX_PLOT_POINTS = 2000
+
+# 모든 그래프에 공통으로 적용하는 레이아웃 (한글 폰트)
+LAYOUT_COMMON = dict(font=dict(family="Malgun Gothic, Apple SD Gothic Neo, sans-serif"))
+
+# 원본 데이터 표에 기본으로 보여줄 행 수
+RAW_PREVIEW_ROWS = 100
+
 # 데이터 로딩 함수
-@st.cache_data
-def load_env_data():
-    """환경 데이터 로딩 (CSV 파일들)"""
-    data_path = Path("data")
+DATA_PATH = Path("data")
+CACHE_PATH = DATA_PATH / ".cache"
+# DataFrame 구성(열, dtype, 인덱스)이 바뀌면 올려서 이전 캐시 무효화
+CACHE_VERSION = 3
+
+def _load_or_cache(name, builder_fn, sources):
+    """원본 파일의 (경로, 수정 시각, 크기)와 학교 목록이 같으면 Parquet 캐시를 읽고, 아니면 새로 만들어 저장"""
+    # 캐시 파일은 SCHOOL_INFO 순서로 저장하므로 학교 목록(순서 포함)도 키에 포함
+    signature = f"v{CACHE_VERSION}|" + ",".join(SCHOOL_INFO) + "|" + "|".join(
+        f"{p.name}:{p.stat().st_mtime_ns}:{p.stat().st_size}" for p in sorted(sources)
+    )
+    key = hashlib.sha1(signature.encode("utf-8")).hexdigest()[:16]
+    cache_dir = CACHE_PATH / f"{name}-{key}"
+    
+    # 학교명 대신 SCHOOL_INFO 순서를 파일명으로 사용 (NFC/NFD 파일명 문제 회피)
+    if cache_dir.is_dir():
+        try:
+            return {
+                school: pd.read_parquet(cache_dir / f"{i}.parquet")
+                for i, school in enumerate(SCHOOL_INFO)
+                if (cache_dir / f"{i}.parquet").exists()
+            }
+        except Exception:
+            pass  # 손상된 캐시는 다시 생성
+    
+    # 원본 중 하나라도 읽지 못했으면 일부만 담긴 결과가 캐시되지 않도록 저장 생략
+    data, complete = builder_fn()
+    if not data or not complete:
+        return data
+    
+    try:
+        tmp_dir = CACHE_PATH / f"{name}-{key}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+        for i, school in enumerate(SCHOOL_INFO):
+            if school in data:
+                data[school].to_parquet(tmp_dir / f"{i}.parquet", compression="zstd")
+        # 이전 버전 캐시 정리 후 교체
+        for stale in CACHE_PATH.glob(f"{name}-*"):
+            if stale != tmp_dir:
+                shutil.rmtree(stale, ignore_errors=True)
+        tmp_dir.rename(cache_dir)
+    except Exception:
+        pass  # 캐시 저장 실패는 무시 (읽기 전용 환경 등)
+    
+    return data
+
+@lru_cache(maxsize=8)
+def _index_dir(dir_str, mtime_ns):
+    """디렉터리를 한 번만 스캔해 (NFC 소문자 파일명, 경로, 확장자) 목록 생성"""
+    with os.scandir(dir_str) as entries:
+        return tuple(
+            (unicodedata.normalize("NFC", entry.name).lower(), Path(entry.path), Path(entry.name).suffix.lower())
+            for entry in entries if entry.is_file()
+        )
+
+def find_file(directory, suffixes, keyword=""):
+    """확장자와 키워드(학교명)로 파일 찾기 (NFC/NFD 대응)"""
+    keyword_nfc = unicodedata.normalize("NFC", keyword).lower()
+    for name, path, suffix in _index_dir(str(directory), directory.stat().st_mtime_ns):
+        if suffix in suffixes and keyword_nfc in name:
+            return path
+    return None
+
+def _detect_time_format(sample):
+    """시간 값 하나로 TIME_FORMATS 중 맞는 형식 찾기 (없으면 None)"""
+    for fmt in TIME_FORMATS:
+        try:
+            datetime.strptime(sample.strip(), fmt)
+            return fmt
+        except ValueError:
+            continue
+    return None
+
+def _read_env_csv(file_path):
+    """CSV 파일 하나를 필요한 열만, 측정 항목은 float32로 바로 읽기"""
+    try:
+        # 멀티스레드 pyarrow CSV 파서 우선 사용
+        df = pd.read_csv(file_path, usecols=ENV_COLUMNS, dtype=ENV_DTYPES, engine="pyarrow")
+    except ImportError:
+        df = pd.read_csv(file_path, usecols=ENV_COLUMNS, dtype=ENV_DTYPES, engine="c")
+    
+    # 파일별 시간 형식을 한 번 찾아 지정하면 값마다 형식을 추론하지 않음
+    times = df["time"].dropna()
+    time_format = _detect_time_format(times.iloc[0]) if not times.empty else None
+    df["time"] = pd.to_datetime(df["time"], format=time_format, errors="coerce")
+    
+    # 시간 인덱스로 정렬해 두면 시계열 그래프와 구간 계산에 바로 사용
+    return df.set_index("time").sort_index()
+
+def _build_env_data(env_files):
+    """학교별 CSV 파일들을 DataFrame으로 변환 → (학교별 DataFrame 사전, 모든 파일을 읽었는지 여부)"""
     env_data = {}
     
-    if not data_path.exists():
-        st.error("❌ data 폴더를 찾을 수 없습니다!")
-        return env_data
-    
-    # CSV 파일 찾기 (NFC/NFD 대응)
-    for file_path in data_path.iterdir():
-        if file_path.suffix.lower() == '.csv':
-            # 파일명 정규화하여 학교명 추출
-            filename_nfc = unicodedata.normalize("NFC", file_path.name)
-            filename_nfd = unicodedata.normalize("NFD", file_path.name)
-            
-            for school in SCHOOL_INFO.keys():
-                school_nfc = unicodedata.normalize("NFC", school)
-                school_nfd = unicodedata.normalize("NFD", school)
+    if not env_files:
+        return env_data, True
+    
+    # pandas CSV 파서는 GIL을 해제하므로 학교별 파일을 스레드로 동시에 파싱
+    with ThreadPoolExecutor(max_workers=len(env_files)) as executor:
+        futures = {
+            school: executor.submit(_read_env_csv, file_path)
+            for school, file_path in env_files.items()
+        }
+    
+    # st.error는 메인 스레드에서만 호출
+    for school, future in futures.items():
+        error = future.exception()
+        if error is None:
+            env_data[school] = future.result()
+        else:
+            st.error(f"❌ {env_files[school].name} 로딩 실패: {error}")
+    
+    return env_data, len(env_data) == len(env_files)
+
+def _open_workbook(xlsx_file):
+    """XLSX 파일 열기 (with 문으로 사용해 읽은 뒤 바로 닫을 것)"""
+    try:
+        # Rust 기반 calamine 엔진 우선 사용 (openpyxl보다 빠르고 메모리 사용이 적음)
+        return pd.ExcelFile(xlsx_file, engine="calamine")
+    except ImportError:
+        return pd.ExcelFile(xlsx_file, engine="openpyxl")
+
+def _normalize_growth_columns(df):
+    """키워드로 생육 지표 열을 찾아 표준 열 이름으로 통일하고 dtype 축소 (없는 지표는 빈 열로 추가)"""
+    col_map = {}
+    for keyword, canonical in GROWTH_COLUMN_KEYWORDS.items():
+        hit = next(
+            (c for c in df.columns if isinstance(c, str) and keyword in unicodedata.normalize("NFC", c)),
+            None
+        )
+        if hit is not None:
+            col_map[hit] = canonical
+    
+    df = df.rename(columns=col_map)
+    missing = [col for col in GROWTH_METRICS if col not in df.columns]
+    df = df.reindex(columns=list(df.columns) + missing)
+    
+    # 숫자가 아닌 값은 빈 값으로, 정수 열에 소수가 섞여 있으면 float32로 대신 축소
+    for col, dtype in GROWTH_DTYPES.items():
+        values = pd.to_numeric(df[col], errors="coerce")
+        if pd.api.types.is_integer_dtype(dtype) and not (values.dropna() % 1 == 0).all():
+            dtype = "float32"
+        df[col] = values.astype(dtype)
+    return df
+
+def _build_growth_data(xlsx_file):
+    """XLSX 파일의 시트들을 학교별 DataFrame으로 변환 → (학교별 DataFrame 사전, 오류 없이 읽었는지 여부)"""
+    growth_data = {}
+    
+    try:
+        # 워크북을 한 번만 열어 필요한 시트를 읽고 바로 닫기 (열어 둔 채로 두면 Windows에서 엑셀이 파일을 저장하지 못함)
+        with _open_workbook(xlsx_file) as excel_file:
+            # 시트명으로 학교를 먼저 찾고 (시트명은 시트마다 한 번만 정규화)
+            sheet_schools = {}
+            for sheet_name in excel_file.sheet_names:
+                sheet_nfc = unicodedata.normalize("NFC", sheet_name)
+                sheet_nfd = unicodedata.normalize("NFD", sheet_name)
                 
-                if (school_nfc in filename_nfc or school_nfd in filename_nfd or
-                    school_nfc in filename_nfd or school_nfd in filename_nfc):
-                    try:
-                        df = pd.read_csv(file_path)
-                        env_data[school] = df
+                for school, (school_nfc, school_nfd) in SCHOOL_NORMS.items():
+                    if school_nfc in sheet_nfc or school_nfd in sheet_nfd:
+                        sheet_schools[sheet_name] = school
                         break
-                    except Exception as e:
-                        st.error(f"❌ {file_path.name} 로딩 실패: {e}")
+            
+            # 해당 시트들만 한 번의 호출로 읽기
+            if sheet_schools:
+                sheets = excel_file.parse(sheet_name=list(sheet_schools))
+                for sheet_name, school in sheet_schools.items():
+                    growth_data[school] = _normalize_growth_columns(sheets[sheet_name])
+        
+    except Exception as e:
+        st.error(f"❌ XLSX 파일 로딩 실패: {e}")
+        return growth_data, False
     
-    return env_data
+    return growth_data, True
 
-@st.cache_data
-def load_growth_data():
-    """생육 결과 데이터 로딩 (XLSX 파일)"""
-    data_path = Path("data")
-    growth_data = {}
+def _data_signature():
+    """data 폴더 파일들의 (이름, 수정 시각, 크기) 목록 (파일이 바뀌면 캐시 키도 바뀜)"""
+    if not DATA_PATH.is_dir():
+        return ()
+    with os.scandir(DATA_PATH) as entries:
+        return tuple(sorted(
+            (entry.name, entry.stat().st_mtime_ns, entry.stat().st_size)
+            for entry in entries if entry.is_file()
+        ))
+
+# sig는 캐시 키로만 사용 (재시작 후에는 Parquet 캐시가 대신하므로 메모리에 최신 데이터 하나만 보관)
+@st.cache_data(max_entries=1)
+def load_env_data(sig):
+    """환경 데이터 로딩 (CSV 파일들)"""
+    if not DATA_PATH.exists():
+        st.error("❌ data 폴더를 찾을 수 없습니다!")
+        return {}
+    
+    # 학교별 CSV 파일 찾기
+    env_files = {}
+    for school in SCHOOL_INFO:
+        file_path = find_file(DATA_PATH, (".csv",), school)
+        if file_path is not None:
+            env_files[school] = file_path
     
-    if not data_path.exists():
+    return _load_or_cache("env", lambda: _build_env_data(env_files), env_files.values())
+
+def _load_growth_sheets():
+    """생육 결과 데이터 로딩 (XLSX 파일)"""
+    if not DATA_PATH.exists():
         st.error("❌ data 폴더를 찾을 수 없습니다!")
-        return growth_data
+        return {}
     
-    # XLSX 파일 찾기
-    xlsx_files = list(data_path.glob("*.xlsx")) + list(data_path.glob("*.xls"))
+    # 첫 번째 XLSX 파일 사용
+    xlsx_file = find_file(DATA_PATH, (".xlsx", ".xls"))
     
-    if not xlsx_files:
+    if xlsx_file is None:
         st.error("❌ 생육 결과 데이터 파일(.xlsx)을 찾을 수 없습니다!")
-        return growth_data
+        return {}
+    return _load_or_cache("growth", lambda: _build_growth_data(xlsx_file), [xlsx_file])
+
+def _build_growth_long(growth_data):
+    """학교별 생육 DataFrame을 학교·EC 열을 붙여 하나로 합치기"""
+    frames = [
+        growth_data[s].assign(학교=s, EC=SCHOOL_INFO[s]['ec'])
+        for s in SCHOOL_ORDER if s in growth_data
+    ]
+    if not frames:
+        return pd.DataFrame(columns=GROWTH_METRICS + ["학교", "EC"])
+    return pd.concat(frames, ignore_index=True)
+
+@st.cache_data(max_entries=1)
+def load_growth_data(sig):
+    """생육 결과 데이터 로딩 → (학교별 원본 DataFrame 사전, 전체를 합친 DataFrame)"""
+    growth_data = _load_growth_sheets()
+    return growth_data, _build_growth_long(growth_data)
+
+def _downsample(series, max_points=MAX_PLOT_POINTS):
+    """LTTB(Largest-Triangle-Three-Buckets)로 시계열의 굴곡을 최대한 살리면서 점 개수 제한"""
+    series = series[series.index.notna()].dropna()
+    n = len(series)
+    if n <= max_points or max_points < 3:
+        return series
     
-    # 첫 번째 XLSX 파일 사용
-    xlsx_file = xlsx_files[0]
+    x = series.index.asi8.astype("float64")
+    y = series.to_numpy("float64")
+    # 첫 점과 마지막 점은 고정, 사이 점들을 (max_points - 2)개 구간으로 나눔
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    edges = np.append(edges, n)
+    
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    prev = 0
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        # 다음 구간의 평균점과 직전 선택점으로 만든 삼각형 넓이가 가장 큰 점 선택
+        next_x = x[end:edges[i + 2]].mean()
+        next_y = y[end:edges[i + 2]].mean()
+        area = np.abs(
+            (x[prev] - next_x) * (y[start:end] - y[prev])
+            - (x[prev] - x[start:end]) * (next_y - y[prev])
+        )
+        prev = start + int(area.argmax())
+        selected[i + 1] = prev
+    
+    return series.iloc[selected]
+
+# 집계 함수 (탭과 무관하게 데이터 파일이 같으면 한 번만 계산, 캐시 키는 sig만 사용해 DataFrame을 해시하지 않음)
+@st.cache_data
+def compute_school_stats(sig, _env_data, _growth_long):
+    """학교별 환경·생육 지표 평균, 목표 EC, 개체수 n (데이터가 없는 학교/지표는 NaN, n은 0)"""
+    env_avg = pd.DataFrame(
+        {s: _env_data[s][ENV_METRICS].mean() for s in SCHOOL_ORDER if s in _env_data},
+        index=ENV_METRICS
+    ).T
+    # 생육 지표는 로딩 때 합쳐 둔 DataFrame에서 groupby 한 번으로 평균 계산
+    growth_avg = _growth_long.groupby("학교", sort=False)[GROWTH_METRICS].mean()
+    
+    stats = pd.concat([env_avg, growth_avg], axis=1).reindex(
+        index=SCHOOL_ORDER, columns=ENV_METRICS + GROWTH_METRICS
+    )
+    stats["target_ec"] = [SCHOOL_INFO[s]['ec'] for s in SCHOOL_ORDER]
+    stats["n"] = _growth_long["학교"].value_counts().reindex(SCHOOL_ORDER, fill_value=0)
+    return stats
+
+# 다운로드 파일 생성 함수
+def _write_xlsx(buffer, sheets):
+    """시트명 → DataFrame 사전을 buffer에 XLSX로 기록 (서식 없이 값만)"""
+    # float32 열은 엑셀에서 21.559999… 처럼 보이지 않도록 최단 표기(문자열)를 거쳐 float64로 변환
+    converted = {}
+    for sheet_name, df in sheets.items():
+        float_cols = df.select_dtypes("float32").columns
+        converted[sheet_name] = df.astype({c: str for c in float_cols}).astype({c: "float64" for c in float_cols})
+    sheets = converted
     
     try:
-        # 모든 시트 읽기
-        excel_file = pd.ExcelFile(xlsx_file)
-        
-        for sheet_name in excel_file.sheet_names:
-            # 시트명 정규화
-            sheet_nfc = unicodedata.normalize("NFC", sheet_name)
-            sheet_nfd = unicodedata.normalize("NFD", sheet_name)
-            
-            for school in SCHOOL_INFO.keys():
-                school_nfc = unicodedata.normalize("NFC", school)
-                school_nfd = unicodedata.normalize("NFD", school)
-                
-                if (school_nfc in sheet_nfc or school_nfd in sheet_nfd or
-                    school_nfc in sheet_nfd or school_nfd in sheet_nfc):
-                    df = pd.read_excel(xlsx_file, sheet_name=sheet_name)
-                    growth_data[school] = df
-                    break
-        
-    except Exception as e:
-        st.error(f"❌ XLSX 파일 로딩 실패: {e}")
+        # 값만 쓰는 경우 pyexcelerate가 ExcelWriter보다 빠르고 메모리 사용이 적음
+        from pyexcelerate import Workbook
+    except ImportError:
+        with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
+            for sheet_name, df in sheets.items():
+                df.to_excel(writer, sheet_name=sheet_name, index=False)
+        return
+    
+    wb = Workbook()
+    for sheet_name, df in sheets.items():
+        # 빈 값(NaN/NA)은 빈 셀로 쓰도록 None으로 변환
+        values = df.astype(object).where(df.notna(), None).values.tolist()
+        wb.new_sheet(sheet_name, data=[df.columns.tolist()] + values)
+    wb.save(buffer)
+
+# 캐시 키는 (학교 목록, 데이터 파일 signature)만 사용 (_로 시작하는 인자는 해시하지 않음)
+@st.cache_data
+def build_growth_xlsx(schools, sig, _growth_data):
+    """선택한 학교들의 생육 데이터를 학교별 시트로 담은 XLSX 바이트"""
+    buffer = io.BytesIO()
+    _write_xlsx(buffer, {s: _growth_data[s] for s in schools if s in _growth_data})
+    return buffer.getvalue()
+
+@st.cache_data
+def build_env_csv(school, sig):
+    """학교 환경 데이터 원본 CSV를 엑셀에서 한글이 깨지지 않는 CSV 바이트로 변환"""
+    # 화면용 DataFrame(시간 변환·정렬, 열 선택) 대신 원본 파일의 열 순서와 시간 표기를 그대로 유지
+    return pd.read_csv(find_file(DATA_PATH, (".csv",), school)).to_csv(index=False).encode('utf-8-sig')
+
+# 그래프 생성 함수 (같은 입력이면 캐시된 Figure 재사용, 화면에는 고정 key로 그려 브라우저가 차이만 갱신)
+@st.cache_resource
+def _subplot_skeleton(subplot_titles, y_titles):
+    """2x2 비교 그래프의 빈 틀(제목, 축 이름, 레이아웃)을 한 번만 생성 (수정하지 말고 복사해서 사용)"""
+    fig = make_subplots(
+        rows=2, cols=2,
+        subplot_titles=subplot_titles,
+        vertical_spacing=0.15,
+        horizontal_spacing=0.1
+    )
+    
+    # 축 이름과 레이아웃을 한 번에 지정 (2x2 축 번호: 1 2 / 3 4, 첫 번째 축은 번호 없음)
+    y_axes = {
+        f"yaxis{i + 1 if i else ''}": dict(title_text=title)
+        for i, title in enumerate(y_titles)
+    }
+    fig.update_layout(
+        xaxis3=dict(title_text="학교"),
+        xaxis4=dict(title_text="학교"),
+        **y_axes,
+        height=600,
+        **LAYOUT_COMMON
+    )
+    
+    return fig
+
+@st.cache_data
+def build_env_subplots(env_avg):
+    """학교별 환경 평균 비교 그래프 (2x2)"""
+    schools_list = env_avg.index.tolist()
+    colors = env_avg.index.map(SCHOOL_COLOR_MAP).tolist()
+    
+    # 캐시된 틀을 복사해 trace만 추가
+    fig = go.Figure(_subplot_skeleton(
+        ("평균 온도", "평균 습도", "평균 pH", "목표 EC vs 실측 EC"),
+        ("온도 (°C)", "습도 (%)", "pH", "EC (dS/m)")
+    ))
+    
+    # 온도
+    fig.add_trace(
+        go.Bar(x=schools_list, y=env_avg['temperature'], marker_color=colors, name="온도",
+               showlegend=False),
+        row=1, col=1
+    )
+    
+    # 습도
+    fig.add_trace(
+        go.Bar(x=schools_list, y=env_avg['humidity'], marker_color=colors, name="습도",
+               showlegend=False),
+        row=1, col=2
+    )
+    
+    # pH
+    fig.add_trace(
+        go.Bar(x=schools_list, y=env_avg['ph'], marker_color=colors, name="pH",
+               showlegend=False),
+        row=2, col=1
+    )
+    
+    # EC 비교
+    fig.add_trace(
+        go.Bar(x=schools_list, y=env_avg['target_ec'], name="목표 EC", marker_color="lightblue"),
+        row=2, col=2
+    )
+    fig.add_trace(
+        go.Bar(x=schools_list, y=env_avg['ec'], name="실측 EC", marker_color=colors),
+        row=2, col=2
+    )
+    
+    fig.update_layout(showlegend=True)
+    
+    return fig
+
+@st.cache_data
+def build_timeseries_figs(sig, school, _env_df):
+    """선택한 학교의 온도/습도/EC 시계열 그래프 (캐시 키는 sig와 학교명)"""
+    color = SCHOOL_COLOR_MAP[school]
     
-    return growth_data
+    # 온도 변화
+    temp = _downsample(_env_df['temperature'])
+    fig_temp = go.Figure()
+    fig_temp.add_trace(go.Scattergl(
+        x=temp.index, y=temp,
+        mode='lines', name='온도',
+        line=dict(color=color, width=2)
+    ))
+    fig_temp.update_layout(
+        title="온도 변화",
+        xaxis_title="측정 시점",
+        yaxis_title="온도 (°C)",
+        height=300,
+        **LAYOUT_COMMON
+    )
+    
+    # 습도 변화
+    humid = _downsample(_env_df['humidity'])
+    fig_humid = go.Figure()
+    fig_humid.add_trace(go.Scattergl(
+        x=humid.index, y=humid,
+        mode='lines', name='습도',
+        line=dict(color=color, width=2)
+    ))
+    fig_humid.update_layout(
+        title="습도 변화",
+        xaxis_title="측정 시점",
+        yaxis_title="습도 (%)",
+        height=300,
+        **LAYOUT_COMMON
+    )
+    
+    # EC 변화
+    ec = _downsample(_env_df['ec'])
+    fig_ec = go.Figure()
+    fig_ec.add_trace(go.Scattergl(
+        x=ec.index, y=ec,
+        mode='lines', name='실측 EC',
+        line=dict(color=color, width=2)
+    ))
+    fig_ec.add_hline(
+        y=SCHOOL_INFO[school]['ec'],
+        line_dash="dash",
+        line_color="red",
+        annotation_text=f"목표 EC: {SCHOOL_INFO[school]['ec']}"
+    )
+    fig_ec.update_layout(
+        title="EC 변화",
+        xaxis_title="측정 시점",
+        yaxis_title="EC (dS/m)",
+        height=300,
+        **LAYOUT_COMMON
+    )
+    
+    return fig_temp, fig_humid, fig_ec
+
+@st.cache_data
+def build_growth_subplots(growth_avg):
+    """학교별 생육 비교 그래프 (2x2)"""
+    schools_list = growth_avg.index.tolist()
+    colors = growth_avg.index.map(SCHOOL_COLOR_MAP).tolist()
+    
+    # 캐시된 틀을 복사해 trace만 추가
+    fig2 = go.Figure(_subplot_skeleton(
+        ("⭐ 평균 생중량", "평균 잎 수", "평균 지상부 길이", "개체수 비교"),
+        ("생중량 (g)", "잎 수 (장)", "길이 (mm)", "개체수")
+    ))
+    
+    # 생중량
+    fig2.add_trace(
+        go.Bar(x=schools_list, y=growth_avg['생중량(g)'], marker_color=colors, showlegend=False),
+        row=1, col=1
+    )
+    
+    # 잎 수
+    fig2.add_trace(
+        go.Bar(x=schools_list, y=growth_avg['잎 수(장)'], marker_color=colors, showlegend=False),
+        row=1, col=2
+    )
+    
+    # 지상부 길이
+    fig2.add_trace(
+        go.Bar(x=schools_list, y=growth_avg['지상부 길이(mm)'], marker_color=colors, showlegend=False),
+        row=2, col=1
+    )
+    
+    # 개체수
+    fig2.add_trace(
+        go.Bar(x=schools_list, y=growth_avg['개체수'], marker_color=colors, showlegend=False),
+        row=2, col=2
+    )
+    
+    return fig2
+
+# 원본 데이터 표 (앞부분 행만 브라우저로 전송)
+def render_raw_table(df, key):
+    """원본 DataFrame의 앞부분만 표로 표시 (표시할 행 수는 사용자가 조절)"""
+    total_rows = len(df)
+    n_rows = st.number_input(
+        "표시할 행 수",
+        min_value=1,
+        max_value=max(total_rows, 1),
+        value=min(RAW_PREVIEW_ROWS, max(total_rows, 1)),
+        step=RAW_PREVIEW_ROWS,
+        key=f"{key}_rows"
+    )
+    st.caption(f"전체 {total_rows:,}행 중 {min(n_rows, total_rows):,}행 표시 (전체 데이터는 다운로드 파일에 포함)")
+    st.dataframe(df.head(n_rows), width="stretch")
+
+# Tab 1: 실험 개요 (위젯이 없어 fragment로 나눌 필요 없음)
+def render_overview_tab(stats, filtered_schools):
+    """실험 개요 탭"""
+    st.header("📖 실험 개요")
+    
+    st.markdown("""
+    ### 연구 배경 및 목적
+    - **목표**: 극지식물(남극좁쌀풀) 재배를 위한 최적 EC 농도 도출
+    - **방법**: 4개 학교에서 서로 다른 EC 농도 조건으로 재배 실험 진행
+    - **측정**: 환경 데이터(온도, 습도, pH, EC) 및 생육 결과(생중량, 잎 수, 길이) 수집
+    """)
+    
+    # 학교별 EC 조건 표
+    st.subheader("🏫 학교별 EC 조건")
+    
+    school_info_df = pd.DataFrame([
+        {
+            "학교명": school,
+            "EC 목표 (dS/m)": info["ec"],
+            "개체수": int(stats.loc[school, "n"]),
+            "색상": info["color"]
+        }
+        for school, info in SCHOOL_INFO.items()
+    ])
+    
+    st.dataframe(
+        school_info_df.style.apply(
+            lambda x: [f"background-color: {SCHOOL_COLOR_MAP[x['학교명']]}33" 
+                      for _ in x], axis=1
+        ),
+        hide_index=True,
+        use_container_width=True
+    )
+    
+    # 주요 지표 카드 (선택한 학교에 따라 변경)
+    st.subheader("📊 주요 지표")
+    col1, col2, col3, col4 = st.columns(4)
+    
+    # 필터링된 데이터로 계산
+    total_samples = int(stats.loc[filtered_schools, "n"].sum())
+    
+    avg_temp, avg_humidity = stats.loc[filtered_schools, ["temperature", "humidity"]].mean().fillna(0)
+    
+    # 최적 EC 찾기 (필터링된 학교 내에서)
+    optimal_ec = "-"
+    avg_weights = stats.loc[filtered_schools, "생중량(g)"].dropna()
+    if not avg_weights.empty:
+        optimal_school = avg_weights.idxmax()
+        optimal_ec = f"{SCHOOL_INFO[optimal_school]['ec']} ({optimal_school})"
+    
+    col1.metric("총 개체수", f"{total_samples}개")
+    col2.metric("평균 온도", f"{avg_temp:.1f}°C")
+    col3.metric("평균 습도", f"{avg_humidity:.1f}%")
+    col4.metric("최적 EC", optimal_ec)
+
+# Tab 2: 환경 데이터
+@st.fragment
+def render_env_tab(env_data, sig, stats, selected_school, filtered_schools):
+    """환경 데이터 탭"""
+    st.header("🌡️ 환경 데이터 분석")
+    
+    if not env_data:
+        st.warning("⚠️ 환경 데이터를 불러올 수 없습니다.")
+        return
+    
+    # 학교별 환경 평균 비교 (필터링 적용)
+    st.subheader(f"📈 {'전체 ' if selected_school == '전체' else selected_school + ' '}환경 평균 비교")
+    
+    # 필터링된 학교만 사용
+    schools_list = [s for s in filtered_schools if s in env_data]
+    
+    fig = build_env_subplots(stats.loc[schools_list, ENV_METRICS + ["target_ec"]])
+    st.plotly_chart(fig, use_container_width=True, key="env_avg_chart")
+    
+    # 시계열 (특정 학교 선택 시에만)
+    if selected_school != "전체" and selected_school in env_data:
+        st.subheader(f"📉 {selected_school} 환경 데이터 시계열")
+        
+        fig_temp, fig_humid, fig_ec = build_timeseries_figs(sig, selected_school, env_data[selected_school])
+        st.plotly_chart(fig_temp, use_container_width=True, key="env_temp_chart")
+        st.plotly_chart(fig_humid, use_container_width=True, key="env_humid_chart")
+        st.plotly_chart(fig_ec, use_container_width=True, key="env_ec_chart")
+    
+    # 환경 데이터 원본 (펼쳤을 때만 표 생성, 다운로드 버튼은 클릭해도 앱을 다시 실행하지 않음)
+    with st.expander("📋 환경 데이터 원본", key="env_raw", on_change="rerun") as raw_expander:
+        if raw_expander.open and selected_school == "전체":
+            # 학교별 탭 중 선택한 탭만 생성
+            raw_schools = [s for s in filtered_schools if s in env_data]
+            raw_tabs = st.tabs(raw_schools, key="env_raw_tabs", on_change="rerun")
+            for school, raw_tab in zip(raw_schools, raw_tabs):
+                if raw_tab.open:
+                    with raw_tab:
+                        render_raw_table(env_data[school], f"env_raw_{school}")
+                        
+                        # CSV 다운로드 (클릭했을 때만 생성)
+                        st.download_button(
+                            label=f"📥 {school} CSV 다운로드",
+                            data=partial(build_env_csv, school, sig),
+                            file_name=f"{school}_환경데이터.csv",
+                            mime="text/csv",
+                            key=f"env_csv_{school}",
+                            on_click="ignore"
+                        )
+        elif raw_expander.open and selected_school in env_data:
+            render_raw_table(env_data[selected_school], f"env_raw_{selected_school}")
+            st.download_button(
+                label=f"📥 CSV 다운로드",
+                data=partial(build_env_csv, selected_school, sig),
+                file_name=f"{selected_school}_환경데이터.csv",
+                mime="text/csv",
+                on_click="ignore"
+            )
+
+# Tab 3: 생육 결과
+@st.fragment
+def render_growth_tab(growth_data, growth_long, sig, stats, selected_school, filtered_schools):
+    """생육 결과 탭"""
+    st.header("📊 생육 결과 분석")
+    
+    if not growth_data:
+        st.warning("⚠️ 생육 결과 데이터를 불러올 수 없습니다.")
+        return
+    
+    # 핵심 결과 카드: EC별 평균 생중량 (필터링 적용)
+    st.subheader(f"🥇 핵심 결과: {'전체 ' if selected_school == '전체' else selected_school + ' '}EC별 평균 생중량")
+    
+    avg_weights_by_ec = {
+        f"EC {SCHOOL_INFO[school]['ec']} ({school})": weight
+        for school, weight in stats.loc[filtered_schools, "생중량(g)"].dropna().items()
+    }
+    
+    if avg_weights_by_ec:
+        # 동적 컬럼 생성
+        num_schools = len(avg_weights_by_ec)
+        cols = st.columns(num_schools)
+        
+        max_weight = max(avg_weights_by_ec.values())
+        
+        for idx, (label, weight) in enumerate(sorted(avg_weights_by_ec.items())):
+            is_max = weight == max_weight
+            cols[idx].metric(
+                label,
+                f"{weight:.3f}g",
+                delta="⭐ 최적" if is_max else None,
+                delta_color="normal" if is_max else "off"
+            )
+    
+    # EC별 생육 비교 (필터링 적용)
+    st.subheader(f"📊 {'전체 ' if selected_school == '전체' else selected_school + ' '}생육 비교")
+    
+    # 필터링된 학교만 사용
+    schools_list = [s for s in filtered_schools if s in growth_data]
+    
+    fig2 = build_growth_subplots(
+        stats.loc[schools_list, GROWTH_METRICS + ["n"]].rename(columns={"n": "개체수"})
+    )
+    
+    st.plotly_chart(fig2, use_container_width=True, key="growth_avg_chart")
+    
+    # 학교별 생중량 분포 (필터링 적용)
+    st.subheader(f"📦 {'전체 ' if selected_school == '전체' else selected_school + ' '}생중량 분포")
+    
+    # 로딩 때 합쳐 둔 DataFrame에서 필터링된 학교만 선택 (분포·상관관계 그래프 공용)
+    combined_df = growth_long[growth_long['학교'].isin(filtered_schools)]
+    
+    fig_box = go.Figure()
+    for school, school_df in combined_df.groupby('학교', sort=False):
+        fig_box.add_trace(go.Box(
+            y=school_df['생중량(g)'],
+            name=school,
+            marker_color=SCHOOL_COLOR_MAP[school]
+        ))
+    
+    fig_box.update_layout(
+        yaxis_title="생중량 (g)",
+        height=400,
+        **LAYOUT_COMMON
+    )
+    
+    st.plotly_chart(fig_box, use_container_width=True, key="growth_box_chart")
+    
+    # 상관관계 분석 (필터링 적용)
+    st.subheader(f"🔗 {'전체 ' if selected_school == '전체' else selected_school + ' '}상관관계 분석")
+    
+    col1, col2 = st.columns(2)
+    
+    # 한 학교만 선택하면 학교 원본 DataFrame을 그대로 쓰고 학교별 색 구분 생략
+    if len(filtered_schools) == 1:
+        school = filtered_schools[0]
+        scatter_df = growth_data.get(school, combined_df)
+        color_args = dict(color_discrete_sequence=[SCHOOL_COLOR_MAP[school]])
+    else:
+        scatter_df = combined_df
+        color_args = dict(color='학교', color_discrete_map=SCHOOL_COLOR_MAP)
+    
+    if not scatter_df.empty:
+        # plotly.express는 상관관계 산점도에서만 쓰므로 그릴 데이터가 있을 때만 불러옴
+        import plotly.express as px
+        
+        with col1:
+            fig_corr1 = px.scatter(
+                scatter_df,
+                x='잎 수(장)',
+                y='생중량(g)',
+                **color_args,
+                title="잎 수 vs 생중량"
+            )
+            fig_corr1.update_layout(
+                height=400,
+                **LAYOUT_COMMON
+            )
+            st.plotly_chart(fig_corr1, use_container_width=True, key="growth_corr1_chart")
+        
+        with col2:
+            fig_corr2 = px.scatter(
+                scatter_df,
+                x='지상부 길이(mm)',
+                y='생중량(g)',
+                **color_args,
+                title="지상부 길이 vs 생중량"
+            )
+            fig_corr2.update_layout(
+                height=400,
+                **LAYOUT_COMMON
+            )
+            st.plotly_chart(fig_corr2, use_container_width=True, key="growth_corr2_chart")
+    
+    # 생육 데이터 원본 (펼쳤을 때만 표 생성, 다운로드 버튼은 클릭해도 앱을 다시 실행하지 않음)
+    with st.expander("📋 생육 데이터 원본", key="growth_raw", on_change="rerun") as raw_expander:
+        if raw_expander.open and selected_school == "전체":
+            # 학교별 탭 중 선택한 탭만 생성
+            raw_schools = [s for s in filtered_schools if s in growth_data]
+            raw_tabs = st.tabs(raw_schools, key="growth_raw_tabs", on_change="rerun")
+            for school, raw_tab in zip(raw_schools, raw_tabs):
+                if raw_tab.open:
+                    with raw_tab:
+                        render_raw_table(growth_data[school], f"growth_raw_{school}")
+            
+            # 전체 XLSX 다운로드 (클릭했을 때만 생성)
+            st.download_button(
+                label="📥 전체 생육 데이터 XLSX 다운로드",
+                data=partial(build_growth_xlsx, tuple(filtered_schools), sig, growth_data),
+                file_name="전체_생육결과데이터.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                on_click="ignore"
+            )
+        elif raw_expander.open and selected_school in growth_data:
+            render_raw_table(growth_data[selected_school], f"growth_raw_{selected_school}")
+            
+            st.download_button(
+                label=f"📥 {selected_school} XLSX 다운로드",
+                data=partial(build_growth_xlsx, (selected_school,), sig, growth_data),
+                file_name=f"{selected_school}_생육결과.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                on_click="ignore"
+            )
 
 # 메인 앱
 def main():
@@ -115,8 +846,9 @@ def main():
     
     # 데이터 로딩
     with st.spinner("📊 데이터 로딩 중..."):
-        env_data = load_env_data()
-        growth_data = load_growth_data()
+        sig = _data_signature()
+        env_data = load_env_data(sig)
+        growth_data, growth_long = load_growth_data(sig)
     
     if not env_data and not growth_data:
         st.error("❌ 데이터를 불러올 수 없습니다. data 폴더와 파일들을 확인해주세요.")
@@ -124,458 +856,29 @@ def main():
     
     # 사이드바
     st.sidebar.title("🔬 분석 옵션")
-    schools = ["전체"] + list(SCHOOL_INFO.keys())
-    selected_school = st.sidebar.selectbox("학교 선택", schools)
+    schools = ["전체"] + SCHOOL_ORDER
+    selected_school = st.sidebar.selectbox("학교 선택", schools, key="selected_school")
     
     # 선택에 따라 필터링할 학교 목록 결정
     if selected_school == "전체":
-        filtered_schools = list(SCHOOL_INFO.keys())
+        filtered_schools = SCHOOL_ORDER
     else:
         filtered_schools = [selected_school]
     
+    # 학교별 평균·개체수 (어느 탭을 보든 한 번만 계산)
+    stats = compute_school_stats(sig, env_data, growth_long)
+    
     # 탭 생성
     tab1, tab2, tab3 = st.tabs(["📖 실험 개요", "🌡️ 환경 데이터", "📊 생육 결과"])
     
-    # Tab 1: 실험 개요
     with tab1:
-        st.header("📖 실험 개요")
-        
-        st.markdown("""
-        ### 연구 배경 및 목적
-        - **목표**: 극지식물(남극좁쌀풀) 재배를 위한 최적 EC 농도 도출
-        - **방법**: 4개 학교에서 서로 다른 EC 농도 조건으로 재배 실험 진행
-        - **측정**: 환경 데이터(온도, 습도, pH, EC) 및 생육 결과(생중량, 잎 수, 길이) 수집
-        """)
-        
-        # 학교별 EC 조건 표
-        st.subheader("🏫 학교별 EC 조건")
-        
-        school_info_df = pd.DataFrame([
-            {
-                "학교명": school,
-                "EC 목표 (dS/m)": info["ec"],
-                "개체수": len(growth_data.get(school, [])),
-                "색상": info["color"]
-            }
-            for school, info in SCHOOL_INFO.items()
-        ])
-        
-        st.dataframe(
-            school_info_df.style.apply(
-                lambda x: [f"background-color: {SCHOOL_INFO[x['학교명']]['color']}33" 
-                          for _ in x], axis=1
-            ),
-            hide_index=True,
-            use_container_width=True
-        )
-        
-        # 주요 지표 카드 (선택한 학교에 따라 변경)
-        st.subheader("📊 주요 지표")
-        col1, col2, col3, col4 = st.columns(4)
-        
-        # 필터링된 데이터로 계산
-        total_samples = sum(len(growth_data[s]) for s in filtered_schools if s in growth_data)
-        
-        if env_data:
-            filtered_env = {s: env_data[s] for s in filtered_schools if s in env_data}
-            if filtered_env:
-                avg_temp = sum(df['temperature'].mean() for df in filtered_env.values()) / len(filtered_env)
-                avg_humidity = sum(df['humidity'].mean() for df in filtered_env.values()) / len(filtered_env)
-            else:
-                avg_temp = 0
-                avg_humidity = 0
-        else:
-            avg_temp = 0
-            avg_humidity = 0
-        
-        # 최적 EC 찾기 (필터링된 학교 내에서)
-        optimal_ec = "-"
-        if growth_data:
-            avg_weights = {}
-            for school in filtered_schools:
-                if school in growth_data:
-                    df = growth_data[school]
-                    if '생중량(g)' in df.columns:
-                        avg_weights[school] = df['생중량(g)'].mean()
-            if avg_weights:
-                optimal_school = max(avg_weights, key=avg_weights.get)
-                optimal_ec = f"{SCHOOL_INFO[optimal_school]['ec']} ({optimal_school})"
-        
-        col1.metric("총 개체수", f"{total_samples}개")
-        col2.metric("평균 온도", f"{avg_temp:.1f}°C")
-        col3.metric("평균 습도", f"{avg_humidity:.1f}%")
-        col4.metric("최적 EC", optimal_ec)
+        render_overview_tab(stats, filtered_schools)
     
-    # Tab 2: 환경 데이터
     with tab2:
-        st.header("🌡️ 환경 데이터 분석")
-        
-        if not env_data:
-            st.warning("⚠️ 환경 데이터를 불러올 수 없습니다.")
-            return
-        
-        # 학교별 환경 평균 비교 (필터링 적용)
-        st.subheader(f"📈 {'전체 ' if selected_school == '전체' else selected_school + ' '}환경 평균 비교")
-        
-        fig = make_subplots(
-            rows=2, cols=2,
-            subplot_titles=("평균 온도", "평균 습도", "평균 pH", "목표 EC vs 실측 EC"),
-            vertical_spacing=0.15,
-            horizontal_spacing=0.1
-        )
-        
-        # 필터링된 학교만 사용
-        schools_list = [s for s in filtered_schools if s in env_data]
-        colors = [SCHOOL_INFO[s]["color"] for s in schools_list]
-        
-        # 평균 계산
-        avg_temps = [env_data[s]['temperature'].mean() for s in schools_list]
-        avg_humids = [env_data[s]['humidity'].mean() for s in schools_list]
-        avg_phs = [env_data[s]['ph'].mean() for s in schools_list]
-        avg_ecs = [env_data[s]['ec'].mean() for s in schools_list]
-        target_ecs = [SCHOOL_INFO[s]['ec'] for s in schools_list]
-        
-        # 온도
-        fig.add_trace(
-            go.Bar(x=schools_list, y=avg_temps, marker_color=colors, name="온도",
-                   showlegend=False),
-            row=1, col=1
-        )
-        
-        # 습도
-        fig.add_trace(
-            go.Bar(x=schools_list, y=avg_humids, marker_color=colors, name="습도",
-                   showlegend=False),
-            row=1, col=2
-        )
-        
-        # pH
-        fig.add_trace(
-            go.Bar(x=schools_list, y=avg_phs, marker_color=colors, name="pH",
-                   showlegend=False),
-            row=2, col=1
-        )
-        
-        # EC 비교
-        fig.add_trace(
-            go.Bar(x=schools_list, y=target_ecs, name="목표 EC", marker_color="lightblue"),
-            row=2, col=2
-        )
-        fig.add_trace(
-            go.Bar(x=schools_list, y=avg_ecs, name="실측 EC", marker_color=colors),
-            row=2, col=2
-        )
-        
-        fig.update_xaxes(title_text="학교", row=2, col=1)
-        fig.update_xaxes(title_text="학교", row=2, col=2)
-        fig.update_yaxes(title_text="온도 (°C)", row=1, col=1)
-        fig.update_yaxes(title_text="습도 (%)", row=1, col=2)
-        fig.update_yaxes(title_text="pH", row=2, col=1)
-        fig.update_yaxes(title_text="EC (dS/m)", row=2, col=2)
-        
-        fig.update_layout(
-            height=600,
-            font=dict(family="Malgun Gothic, Apple SD Gothic Neo, sans-serif"),
-            showlegend=True
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
-        
-        # 시계열 (특정 학교 선택 시에만)
-        if selected_school != "전체" and selected_school in env_data:
-            st.subheader(f"📉 {selected_school} 환경 데이터 시계열")
-            
-            df = env_data[selected_school].copy()
-            
-            # 온도 변화
-            fig_temp = go.Figure()
-            fig_temp.add_trace(go.Scatter(
-                x=df.index, y=df['temperature'],
-                mode='lines', name='온도',
-                line=dict(color=SCHOOL_INFO[selected_school]['color'], width=2)
-            ))
-            fig_temp.update_layout(
-                title="온도 변화",
-                xaxis_title="측정 시점",
-                yaxis_title="온도 (°C)",
-                height=300,
-                font=dict(family="Malgun Gothic, Apple SD Gothic Neo, sans-serif")
-            )
-            st.plotly_chart(fig_temp, use_container_width=True)
-            
-            # 습도 변화
-            fig_humid = go.Figure()
-            fig_humid.add_trace(go.Scatter(
-                x=df.index, y=df['humidity'],
-                mode='lines', name='습도',
-                line=dict(color=SCHOOL_INFO[selected_school]['color'], width=2)
-            ))
-            fig_humid.update_layout(
-                title="습도 변화",
-                xaxis_title="측정 시점",
-                yaxis_title="습도 (%)",
-                height=300,
-                font=dict(family="Malgun Gothic, Apple SD Gothic Neo, sans-serif")
-            )
-            st.plotly_chart(fig_humid, use_container_width=True)
-            
-            # EC 변화
-            fig_ec = go.Figure()
-            fig_ec.add_trace(go.Scatter(
-                x=df.index, y=df['ec'],
-                mode='lines', name='실측 EC',
-                line=dict(color=SCHOOL_INFO[selected_school]['color'], width=2)
-            ))
-            fig_ec.add_hline(
-                y=SCHOOL_INFO[selected_school]['ec'],
-                line_dash="dash",
-                line_color="red",
-                annotation_text=f"목표 EC: {SCHOOL_INFO[selected_school]['ec']}"
-            )
-            fig_ec.update_layout(
-                title="EC 변화",
-                xaxis_title="측정 시점",
-                yaxis_title="EC (dS/m)",
-                height=300,
-                font=dict(family="Malgun Gothic, Apple SD Gothic Neo, sans-serif")
-            )
-            st.plotly_chart(fig_ec, use_container_width=True)
-        
-        # 환경 데이터 원본
-        with st.expander("📋 환경 데이터 원본"):
-            if selected_school == "전체":
-                for school in filtered_schools:
-                    if school in env_data:
-                        st.subheader(school)
-                        st.dataframe(env_data[school], use_container_width=True)
-                        
-                        # CSV 다운로드
-                        csv = env_data[school].to_csv(index=False).encode('utf-8-sig')
-                        st.download_button(
-                            label=f"📥 {school} CSV 다운로드",
-                            data=csv,
-                            file_name=f"{school}_환경데이터.csv",
-                            mime="text/csv",
-                            key=f"env_csv_{school}"
-                        )
-            else:
-                if selected_school in env_data:
-                    st.dataframe(env_data[selected_school], use_container_width=True)
-                    csv = env_data[selected_school].to_csv(index=False).encode('utf-8-sig')
-                    st.download_button(
-                        label=f"📥 CSV 다운로드",
-                        data=csv,
-                        file_name=f"{selected_school}_환경데이터.csv",
-                        mime="text/csv"
-                    )
-    
-    # Tab 3: 생육 결과
+        render_env_tab(env_data, sig, stats, selected_school, filtered_schools)
+    
     with tab3:
-        st.header("📊 생육 결과 분석")
-        
-        if not growth_data:
-            st.warning("⚠️ 생육 결과 데이터를 불러올 수 없습니다.")
-            return
-        
-        # 핵심 결과 카드: EC별 평균 생중량 (필터링 적용)
-        st.subheader(f"🥇 핵심 결과: {'전체 ' if selected_school == '전체' else selected_school + ' '}EC별 평균 생중량")
-        
-        avg_weights_by_ec = {}
-        for school in filtered_schools:
-            if school in growth_data:
-                df = growth_data[school]
-                if '생중량(g)' in df.columns:
-                    ec = SCHOOL_INFO[school]['ec']
-                    avg_weight = df['생중량(g)'].mean()
-                    avg_weights_by_ec[f"EC {ec} ({school})"] = avg_weight
-        
-        if avg_weights_by_ec:
-            # 동적 컬럼 생성
-            num_schools = len(avg_weights_by_ec)
-            cols = st.columns(num_schools)
-            
-            max_weight = max(avg_weights_by_ec.values())
-            
-            for idx, (label, weight) in enumerate(sorted(avg_weights_by_ec.items())):
-                is_max = weight == max_weight
-                cols[idx].metric(
-                    label,
-                    f"{weight:.3f}g",
-                    delta="⭐ 최적" if is_max else None,
-                    delta_color="normal" if is_max else "off"
-                )
-        
-        # EC별 생육 비교 (필터링 적용)
-        st.subheader(f"📊 {'전체 ' if selected_school == '전체' else selected_school + ' '}생육 비교")
-        
-        fig2 = make_subplots(
-            rows=2, cols=2,
-            subplot_titles=("⭐ 평균 생중량", "평균 잎 수", "평균 지상부 길이", "개체수 비교"),
-            vertical_spacing=0.15,
-            horizontal_spacing=0.1
-        )
-        
-        # 필터링된 학교만 사용
-        schools_list = [s for s in filtered_schools if s in growth_data]
-        colors = [SCHOOL_INFO[s]["color"] for s in schools_list]
-        
-        # 평균 계산
-        avg_weights = []
-        avg_leaves = []
-        avg_heights = []
-        sample_counts = []
-        
-        for school in schools_list:
-            df = growth_data[school]
-            avg_weights.append(df['생중량(g)'].mean() if '생중량(g)' in df.columns else 0)
-            avg_leaves.append(df['잎 수(장)'].mean() if '잎 수(장)' in df.columns else 0)
-            avg_heights.append(df['지상부 길이(mm)'].mean() if '지상부 길이(mm)' in df.columns else 0)
-            sample_counts.append(len(df))
-        
-        # 생중량
-        fig2.add_trace(
-            go.Bar(x=schools_list, y=avg_weights, marker_color=colors, showlegend=False),
-            row=1, col=1
-        )
-        
-        # 잎 수
-        fig2.add_trace(
-            go.Bar(x=schools_list, y=avg_leaves, marker_color=colors, showlegend=False),
-            row=1, col=2
-        )
-        
-        # 지상부 길이
-        fig2.add_trace(
-            go.Bar(x=schools_list, y=avg_heights, marker_color=colors, showlegend=False),
-            row=2, col=1
-        )
-        
-        # 개체수
-        fig2.add_trace(
-            go.Bar(x=schools_list, y=sample_counts, marker_color=colors, showlegend=False),
-            row=2, col=2
-        )
-        
-        fig2.update_xaxes(title_text="학교", row=2, col=1)
-        fig2.update_xaxes(title_text="학교", row=2, col=2)
-        fig2.update_yaxes(title_text="생중량 (g)", row=1, col=1)
-        fig2.update_yaxes(title_text="잎 수 (장)", row=1, col=2)
-        fig2.update_yaxes(title_text="길이 (mm)", row=2, col=1)
-        fig2.update_yaxes(title_text="개체수", row=2, col=2)
-        
-        fig2.update_layout(
-            height=600,
-            font=dict(family="Malgun Gothic, Apple SD Gothic Neo, sans-serif")
-        )
-        
-        st.plotly_chart(fig2, use_container_width=True)
-        
-        # 학교별 생중량 분포 (필터링 적용)
-        st.subheader(f"📦 {'전체 ' if selected_school == '전체' else selected_school + ' '}생중량 분포")
-        
-        fig_box = go.Figure()
-        for school in schools_list:
-            df = growth_data[school]
-            if '생중량(g)' in df.columns:
-                fig_box.add_trace(go.Box(
-                    y=df['생중량(g)'],
-                    name=school,
-                    marker_color=SCHOOL_INFO[school]['color']
-                ))
-        
-        fig_box.update_layout(
-            yaxis_title="생중량 (g)",
-            height=400,
-            font=dict(family="Malgun Gothic, Apple SD Gothic Neo, sans-serif")
-        )
-        
-        st.plotly_chart(fig_box, use_container_width=True)
-        
-        # 상관관계 분석 (필터링 적용)
-        st.subheader(f"🔗 {'전체 ' if selected_school == '전체' else selected_school + ' '}상관관계 분석")
-        
-        col1, col2 = st.columns(2)
-        
-        # 필터링된 데이터 합치기
-        all_data = []
-        for school in filtered_schools:
-            if school in growth_data:
-                df_copy = growth_data[school].copy()
-                df_copy['학교'] = school
-                df_copy['EC'] = SCHOOL_INFO[school]['ec']
-                all_data.append(df_copy)
-        
-        if all_data:
-            combined_df = pd.concat(all_data, ignore_index=True)
-            
-            with col1:
-                if '잎 수(장)' in combined_df.columns and '생중량(g)' in combined_df.columns:
-                    fig_corr1 = px.scatter(
-                        combined_df,
-                        x='잎 수(장)',
-                        y='생중량(g)',
-                        color='학교',
-                        color_discrete_map={s: SCHOOL_INFO[s]['color'] for s in schools_list},
-                        title="잎 수 vs 생중량"
-                    )
-                    fig_corr1.update_layout(
-                        height=400,
-                        font=dict(family="Malgun Gothic, Apple SD Gothic Neo, sans-serif")
-                    )
-                    st.plotly_chart(fig_corr1, use_container_width=True)
-            
-            with col2:
-                if '지상부 길이(mm)' in combined_df.columns and '생중량(g)' in combined_df.columns:
-                    fig_corr2 = px.scatter(
-                        combined_df,
-                        x='지상부 길이(mm)',
-                        y='생중량(g)',
-                        color='학교',
-                        color_discrete_map={s: SCHOOL_INFO[s]['color'] for s in schools_list},
-                        title="지상부 길이 vs 생중량"
-                    )
-                    fig_corr2.update_layout(
-                        height=400,
-                        font=dict(family="Malgun Gothic, Apple SD Gothic Neo, sans-serif")
-                    )
-                    st.plotly_chart(fig_corr2, use_container_width=True)
-        
-        # 생육 데이터 원본
-        with st.expander("📋 생육 데이터 원본"):
-            if selected_school == "전체":
-                for school in filtered_schools:
-                    if school in growth_data:
-                        st.subheader(school)
-                        st.dataframe(growth_data[school], use_container_width=True)
-                
-                # 전체 XLSX 다운로드
-                buffer = io.BytesIO()
-                with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                    for school in filtered_schools:
-                        if school in growth_data:
-                            growth_data[school].to_excel(writer, sheet_name=school, index=False)
-                buffer.seek(0)
-                
-                st.download_button(
-                    label="📥 전체 생육 데이터 XLSX 다운로드",
-                    data=buffer,
-                    file_name="전체_생육결과데이터.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
-            else:
-                if selected_school in growth_data:
-                    st.dataframe(growth_data[selected_school], use_container_width=True)
-                    
-                    buffer = io.BytesIO()
-                    growth_data[selected_school].to_excel(buffer, index=False, engine='openpyxl')
-                    buffer.seek(0)
-                    
-                    st.download_button(
-                        label=f"📥 {selected_school} XLSX 다운로드",
-                        data=buffer,
-                        file_name=f"{selected_school}_생육결과.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                    )
+        render_growth_tab(growth_data, growth_long, sig, stats, selected_school, filtered_schools)
 
 if __name__ == "__main__":
     main()